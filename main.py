@@ -2,14 +2,19 @@ import os
 import re
 import csv
 import json
+import pickle
+import sqlite3
 import yaml
 import shutil
 import subprocess
 import tempfile
-from collections import Counter, defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, defaultdict, deque
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from providers import PROVIDERS
+from providers import LOCAL_PROVIDERS, PROVIDERS
 
 # ====================================================
 # CONFIGURATION
@@ -20,8 +25,17 @@ OUTPUT_FILE_JSON = "agentic_agent_profiles.json"
 OUTPUT_SEMANTIC_JSON = "agentic_semantic_features.json"
 LOG_FILE = "clone_failures.log"
 MAX_WORKERS = 6
+SCAN_WORKERS = os.cpu_count() or 1
+SCAN_CHUNKS_PER_WORKER = 4  # extra chunks let idle workers take over stragglers' work
+MIN_SCAN_CHUNK_BYTES = 256 * 1024
+SCAN_IN_FLIGHT_PER_WORKER = 2  # queued chunks per worker; bounds buffered results
+PARALLEL_SCAN_MIN_BYTES = 8 * 1024 * 1024  # smaller repos are scanned inline
 
 CLONE_DIR = Path(tempfile.gettempdir()) / "agentic_repos"
+INDEX_DIR = Path(".agentic_index")  # persistent scan indexes for LOCAL_PROVIDERS
+INDEX_VERSION = 3
+METADATA_FILENAMES = ("README.md",)
+METADATA_SUFFIXES = (".yaml", ".yml", ".json")
 
 # ====================================================
 # LOGGING
@@ -36,12 +50,15 @@ def log_failure(provider, repo_url, error_text):
 # README + CONFIG PARSERS
 # ====================================================
 def extract_readme_info(repo_path: Path):
-    readme_data = {"name": None, "description": None, "tools": [], "models": []}
     readme_files = list(repo_path.rglob("README.md"))
-    if not readme_files:
+    return parse_readme(readme_files[0] if readme_files else None)
+
+def parse_readme(readme_path):
+    readme_data = {"name": None, "description": None, "tools": [], "models": []}
+    if readme_path is None:
         return readme_data
     try:
-        with open(readme_files[0], encoding="utf-8", errors="ignore") as f:
+        with open(readme_path, encoding="utf-8", errors="ignore") as f:
             content = f.read()
         name_match = re.search(r"#\s*([A-Z][\w\s-]+(?:Agent|Bot|System)?)", content)
         if name_match:
@@ -71,43 +88,57 @@ def extract_readme_info(repo_path: Path):
     return readme_data
 
 def extract_config_info(repo_path: Path):
+    parts = [
+        parse_config_file(file)
+        for ext in ("*.yaml", "*.yml", "*.json")
+        for file in repo_path.rglob(ext)
+    ]
+    return merge_config_info(parts)
+
+def parse_config_file(file):
+    """Return the raw env_vars/models/tools lists found in one YAML/JSON file."""
     config_data = {"env_vars": [], "models": [], "tools": []}
-    for ext in ("*.yaml", "*.yml", "*.json"):
-        for file in repo_path.rglob(ext):
-            try:
-                with open(file, encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
-                    if ext in ("*.yaml", "*.yml"):
-                        data = yaml.safe_load(text)
-                    else:
-                        data = json.loads(text)
-                    if not isinstance(data, dict):
-                        continue
-                    def flatten(d, parent_key=""):
-                        items = []
-                        for k, v in d.items():
-                            new_key = f"{parent_key}.{k}" if parent_key else k
-                            if isinstance(v, dict):
-                                items.extend(flatten(v, new_key))
-                            elif isinstance(v, list):
-                                for i in v:
-                                    if isinstance(i, (dict, list)):
-                                        items.extend(flatten({"list_item": i}, new_key))
-                                    else:
-                                        items.append((new_key, str(i)))
+    try:
+        with open(file, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+            if str(file).endswith((".yaml", ".yml")):
+                data = yaml.safe_load(text)
+            else:
+                data = json.loads(text)
+            if not isinstance(data, dict):
+                return config_data
+            def flatten(d, parent_key=""):
+                items = []
+                for k, v in d.items():
+                    new_key = f"{parent_key}.{k}" if parent_key else k
+                    if isinstance(v, dict):
+                        items.extend(flatten(v, new_key))
+                    elif isinstance(v, list):
+                        for i in v:
+                            if isinstance(i, (dict, list)):
+                                items.extend(flatten({"list_item": i}, new_key))
                             else:
-                                items.append((new_key, str(v)))
-                        return items
-                    flat_items = flatten(data)
-                    for key, value in flat_items:
-                        if "api_key" in key.lower() or "token" in key.lower():
-                            config_data["env_vars"].append(key)
-                        if "model" in key.lower():
-                            config_data["models"].append(value)
-                        if "tool" in key.lower():
-                            config_data["tools"].append(value)
-            except Exception:
-                continue
+                                items.append((new_key, str(i)))
+                    else:
+                        items.append((new_key, str(v)))
+                return items
+            flat_items = flatten(data)
+            for key, value in flat_items:
+                if "api_key" in key.lower() or "token" in key.lower():
+                    config_data["env_vars"].append(key)
+                if "model" in key.lower():
+                    config_data["models"].append(value)
+                if "tool" in key.lower():
+                    config_data["tools"].append(value)
+    except Exception:
+        pass
+    return config_data
+
+def merge_config_info(parts):
+    config_data = {"env_vars": [], "models": [], "tools": []}
+    for part in parts:
+        for k in config_data:
+            config_data[k].extend(part[k])
     for k in config_data:
         config_data[k] = sorted(set(map(str, config_data[k])))
     return config_data
@@ -122,27 +153,375 @@ def extract_features_from_code(code: str):
     apis = re.findall(r"(\w+)\.", code)
     return imports, classes, funcs, apis
 
-def analyze_local_repo(repo_path: Path):
-    counters = defaultdict(Counter)
-    semantic_summary = defaultdict(set)
+def list_source_files(repo_path: Path):
+    """Return (path, size) for every relevant source file, in os.walk order."""
+    entries = []
     for root, _, files in os.walk(repo_path):
         for file in files:
             if file.endswith(RELEVANT_FILETYPES):
                 path = Path(root) / file
                 try:
-                    with open(path, encoding="utf-8", errors="ignore") as f:
-                        code = f.read()
-                    imports, classes, funcs, apis = extract_features_from_code(code)
-                    counters["imports"].update(imports)
-                    counters["classes"].update(classes)
-                    counters["functions"].update(funcs)
-                    counters["apis"].update(apis)
-                except Exception as e:
-                    print(f"⚠️ Error reading {path}: {e}")
-    readme_info = extract_readme_info(repo_path)
-    config_info = extract_config_info(repo_path)
+                    size = path.stat().st_size
+                except OSError:
+                    size = 0
+                entries.append((path, size))
+    return entries
+
+def chunk_by_size(entries, chunk_bytes=None):
+    """
+    Split the file list into contiguous chunks of roughly `chunk_bytes` each
+    (by default SCAN_CHUNKS_PER_WORKER chunks per scan worker).
+    Chunks stay contiguous so merging them in order reproduces the
+    sequential scan exactly (including Counter insertion order).
+    """
+    if chunk_bytes is None:
+        total_bytes = sum(size for _, size in entries)
+        chunk_bytes = max(total_bytes // (SCAN_WORKERS * SCAN_CHUNKS_PER_WORKER), MIN_SCAN_CHUNK_BYTES)
+    chunks, current, current_bytes = [], [], 0
+    for path, size in entries:
+        current.append(path)
+        current_bytes += size
+        if current_bytes >= chunk_bytes:
+            chunks.append(current)
+            current, current_bytes = [], 0
+    if current:
+        # Fold a small tail into the previous chunk rather than leaving a runt
+        if chunks and current_bytes < chunk_bytes // 2:
+            chunks[-1].extend(current)
+        else:
+            chunks.append(current)
+    return chunks
+
+def extract_file_features(path):
+    """Return {ftype: Counter} for one source file, or None if it can't be read."""
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            code = f.read()
+    except Exception as e:
+        print(f"⚠️ Error reading {path}: {e}")
+        return None
+    imports, classes, funcs, apis = extract_features_from_code(code)
+    return {
+        "imports": Counter(imports),
+        "classes": Counter(classes),
+        "functions": Counter(funcs),
+        "apis": Counter(apis),
+    }
+
+def extract_files(paths):
+    return [(path, extract_file_features(path)) for path in paths]
+
+def scan_files(paths):
+    counters = defaultdict(Counter)
+    for path in paths:
+        features = extract_file_features(path)
+        if features is None:
+            continue
+        for ftype, counter in features.items():
+            counters[ftype].update(counter)
+    return counters
+
+# One process pool is shared by every provider thread. Chunks from all repos
+# queue on it together, so a worker that finishes a small repo immediately
+# picks up pending chunks of a large one instead of sitting idle.
+_scan_pool = None
+_scan_pool_lock = threading.Lock()
+
+def get_scan_pool():
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            # "spawn" so workers never fork a copy of a process whose other
+            # threads may be holding locks (stdout, logging, git subprocesses)
+            _scan_pool = ProcessPoolExecutor(
+                max_workers=SCAN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _scan_pool
+
+def shutdown_scan_pool():
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is not None:
+            _scan_pool.shutdown()
+            _scan_pool = None
+
+def iter_chunks(func, entries):
+    """
+    Run `func(paths)` over size-balanced chunks of `entries` and yield the
+    per-chunk results in file order. At most SCAN_IN_FLIGHT_PER_WORKER chunks
+    per worker are queued at once, so memory is bounded by chunk size rather
+    than tree size. Small inputs run inline; if the process pool breaks,
+    the remaining chunks run sequentially.
+    """
+    total_bytes = sum(size for _, size in entries)
+    if SCAN_WORKERS <= 1 or total_bytes < PARALLEL_SCAN_MIN_BYTES:
+        yield func([path for path, _ in entries])
+        return
+    chunks = chunk_by_size(entries)
+    max_in_flight = SCAN_WORKERS * SCAN_IN_FLIGHT_PER_WORKER
+    pending = deque()
+    next_chunk = 0
+    try:
+        pool = get_scan_pool()
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                pending.append(pool.submit(func, chunks[next_chunk]))
+                next_chunk += 1
+            result = pending[0].result()
+            pending.popleft()
+            yield result
+    except BrokenProcessPool as e:
+        print(f"⚠️ Parallel scan failed ({e}), falling back to sequential scan")
+        shutdown_scan_pool()
+        for chunk in chunks[next_chunk - len(pending):]:
+            yield func(chunk)
+
+def scan_files_parallel(entries):
+    counters = defaultdict(Counter)
+    # Merge in chunk order so the result is identical to a sequential scan
+    for chunk_counters in iter_chunks(scan_files, entries):
+        for ftype, counter in chunk_counters.items():
+            counters[ftype].update(counter)
+    return counters
+
+def analyze_local_repo(repo_path: Path):
+    with ThreadPoolExecutor(max_workers=2) as meta_executor:
+        # README and config parsing overlap with the code scan
+        readme_future = meta_executor.submit(extract_readme_info, repo_path)
+        config_future = meta_executor.submit(extract_config_info, repo_path)
+        counters = scan_files_parallel(list_source_files(repo_path))
+        readme_info = readme_future.result()
+        config_info = config_future.result()
     return counters, readme_info, config_info
 
+# ====================================================
+# INDEXED SCAN (LOCAL NON-GIT TREES)
+# ====================================================
+def stat_tree(root: Path):
+    """
+    Walk `root` with os.scandir and return ({relpath: (size, mtime_ns, inode)}
+    for source files, same for README/config files).
+    """
+    sources, metadata = {}, {}
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        name = entry.name
+                        if name.endswith(RELEVANT_FILETYPES):
+                            target = sources
+                        elif name in METADATA_FILENAMES or name.endswith(METADATA_SUFFIXES):
+                            target = metadata
+                        else:
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        rel = os.path.relpath(entry.path, root)
+                        target[rel] = (st.st_size, st.st_mtime_ns, st.st_ino)
+                    except OSError as e:
+                        print(f"⚠️ Error reading {entry.path}: {e}")
+        except OSError as e:
+            print(f"⚠️ Error reading {current}: {e}")
+    return sources, metadata
+
+INDEX_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB)",
+    # One row per indexed source file; features is a pickled {ftype: Counter}
+    "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER,"
+    " mtime_ns INTEGER, inode INTEGER, features BLOB)",
+    # Aggregate of the files directly inside each directory
+    "CREATE TABLE IF NOT EXISTS dirs (dir TEXT PRIMARY KEY, counters BLOB)",
+    # README/config files with their parsed info (parse_readme / parse_config_file)
+    "CREATE TABLE IF NOT EXISTS meta_files (path TEXT PRIMARY KEY, size INTEGER,"
+    " mtime_ns INTEGER, inode INTEGER, info BLOB)",
+)
+
+def open_index(index_path: Path, root: Path):
+    """Open (or reset) the sqlite index for `root`; rows are updated in place."""
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    for stmt in INDEX_SCHEMA:
+        conn.execute(stmt)
+    if (get_state(conn, "version"), get_state(conn, "root")) != (INDEX_VERSION, str(root)):
+        with conn:
+            for table in ("state", "files", "dirs", "meta_files"):
+                conn.execute(f"DELETE FROM {table}")
+            set_state(conn, "version", INDEX_VERSION)
+            set_state(conn, "root", str(root))
+    return conn
+
+def get_state(conn, key, default=None):
+    row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+    return pickle.loads(row[0]) if row else default
+
+def set_state(conn, key, value):
+    conn.execute(
+        "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+        (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+    )
+
+def _apply_counters(agg, counters, sign):
+    for ftype, counter in counters.items():
+        if not counter:
+            continue
+        target = agg.setdefault(ftype, Counter())
+        if sign > 0:
+            target.update(counter)
+        else:
+            target.subtract(counter)
+            agg[ftype] = +target
+            if not agg[ftype]:
+                del agg[ftype]
+
+def _update_index(conn, root, sources, indexed, deleted, changed):
+    """
+    Apply deleted/changed files to the files, dirs and totals rows. Each
+    extraction chunk is written and committed as it arrives, so a first run
+    over a huge tree never holds more than a few chunks of features.
+    """
+    totals = get_state(conn, "totals", {})
+    dirs = {}
+
+    def dir_agg(rel):
+        reldir = os.path.dirname(rel)
+        if reldir not in dirs:
+            row = conn.execute("SELECT counters FROM dirs WHERE dir = ?", (reldir,)).fetchone()
+            dirs[reldir] = pickle.loads(row[0]) if row else {}
+        return dirs[reldir]
+
+    def drop(rel):
+        row = conn.execute("SELECT features FROM files WHERE path = ?", (rel,)).fetchone()
+        if row:
+            old = pickle.loads(row[0])
+            _apply_counters(dir_agg(rel), old, -1)
+            _apply_counters(totals, old, -1)
+            conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+    def flush():
+        # Persist touched directories and totals together with their file rows
+        for reldir, agg in dirs.items():
+            if agg:
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs (dir, counters) VALUES (?, ?)",
+                    (reldir, pickle.dumps(agg, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+            else:
+                conn.execute("DELETE FROM dirs WHERE dir = ?", (reldir,))
+        dirs.clear()
+        set_state(conn, "totals", totals)
+        conn.commit()
+
+    for rel in deleted:
+        drop(rel)
+    flush()
+    for chunk in iter_chunks(extract_files, changed):
+        for path, features in chunk:
+            rel = os.path.relpath(path, root)
+            if rel in indexed:
+                drop(rel)
+            if features is None:
+                continue
+            conn.execute(
+                "INSERT INTO files (path, size, mtime_ns, inode, features) VALUES (?, ?, ?, ?, ?)",
+                (rel, *sources[rel], pickle.dumps(features, protocol=pickle.HIGHEST_PROTOCOL)),
+            )
+            _apply_counters(dir_agg(rel), features, +1)
+            _apply_counters(totals, features, +1)
+        flush()
+
+def _is_readme(rel):
+    return os.path.basename(rel) in METADATA_FILENAMES
+
+def _update_metadata(conn, root, metadata):
+    """
+    Re-parse only new or changed README/config files, then refresh the
+    cached readme/config summaries if anything changed. The README used is
+    the shallowest one, matching a top-level README when there is one.
+    """
+    indexed = {
+        path: (size, mtime_ns, inode)
+        for path, size, mtime_ns, inode in conn.execute(
+            "SELECT path, size, mtime_ns, inode FROM meta_files"
+        )
+    }
+    deleted = [rel for rel in indexed if rel not in metadata]
+    changed = [rel for rel, stat in metadata.items() if indexed.get(rel) != stat]
+    if not deleted and not changed and get_state(conn, "readme") is not None:
+        return
+    for rel in deleted:
+        conn.execute("DELETE FROM meta_files WHERE path = ?", (rel,))
+    for rel in changed:
+        parse = parse_readme if _is_readme(rel) else parse_config_file
+        conn.execute(
+            "INSERT OR REPLACE INTO meta_files (path, size, mtime_ns, inode, info) VALUES (?, ?, ?, ?, ?)",
+            (rel, *metadata[rel], pickle.dumps(parse(root / rel), protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+    readmes = sorted((rel for rel in metadata if _is_readme(rel)), key=lambda r: (r.count(os.sep), r))
+    readme = parse_readme(None)
+    if readmes:
+        row = conn.execute("SELECT info FROM meta_files WHERE path = ?", (readmes[0],)).fetchone()
+        readme = pickle.loads(row[0])
+    set_state(conn, "readme", readme)
+    if any(not _is_readme(rel) for rel in deleted + changed) or get_state(conn, "config") is None:
+        parts = [
+            pickle.loads(info)
+            for path, info in conn.execute("SELECT path, info FROM meta_files")
+            if not _is_readme(path)
+        ]
+        set_state(conn, "config", merge_config_info(parts))
+
+def analyze_indexed_tree(provider, root: Path):
+    """
+    Incrementally analyze a local directory tree that is not a git checkout.
+    Files whose (size, mtime, inode) match the previous run reuse their
+    indexed features; only new or changed files are re-read, and deleted
+    files are dropped from the per-directory aggregates. Only changed rows
+    are written, and an unchanged tree writes nothing.
+    """
+    root = Path(root).resolve()
+    conn = open_index(INDEX_DIR / f"{provider}.sqlite", root)
+    try:
+        sources, metadata = stat_tree(root)
+        indexed = {
+            path: (size, mtime_ns, inode)
+            for path, size, mtime_ns, inode in conn.execute(
+                "SELECT path, size, mtime_ns, inode FROM files"
+            )
+        }
+        deleted = [rel for rel in indexed if rel not in sources]
+        changed = [
+            (root / rel, stat[0]) for rel, stat in sources.items()
+            if indexed.get(rel) != stat
+        ]
+        if deleted or changed:
+            _update_index(conn, root, sources, indexed, deleted, changed)
+        with conn:
+            _update_metadata(conn, root, metadata)
+        print(f"📇 {provider}: {len(changed)} of {len(sources)} files re-extracted")
+
+        counters = defaultdict(Counter, get_state(conn, "totals", {}))
+        return counters, get_state(conn, "readme"), get_state(conn, "config")
+    finally:
+        conn.close()
+
+def analyze_local_provider(provider, root):
+    try:
+        counters, readme, config = analyze_indexed_tree(provider, Path(root))
+        print(f"✅ Finished analyzing {provider}")
+        return provider, counters, readme, config
+    except Exception as e:
+        log_failure(provider, str(root), str(e))
+        return provider, None
+
 # ====================================================
 # CLONE + ANALYZE
 # ====================================================
@@ -219,6 +598,10 @@ def main():
             executor.submit(clone_and_analyze, provider, url): provider
             for provider, url in PROVIDERS.items()
         }
+        futures.update({
+            executor.submit(analyze_local_provider, provider, path): provider
+            for provider, path in LOCAL_PROVIDERS.items()
+        })
         for future in as_completed(futures):
             provider = futures[future]
             result = future.result()
@@ -229,6 +612,7 @@ def main():
                     "readme": readme,
                     "config": config,
                 }
+    shutdown_scan_pool()
     write_outputs(results)
     if CLONE_DIR.exists():
         shutil.rmtree(CLONE_DIR, ignore_errors=True)
@@ -11,8 +11,12 @@ This module:
 """
 
 import json
+import math
 import os
 import re
+import subprocess
+import sys
+import time
 from collections import defaultdict, Counter
 
 
@@ -178,22 +182,390 @@ if __name__ == "__main__":
 # REGEX EXPORT UTILITIES
 # ======================================================
 
-def export_dynamic_regexes(output_path="agentic_regex_patterns.json"):
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+BENCHMARK_SUFFIXES = (".py", ".js", ".ts", ".md")
+COSTLY_FACTOR = 5.0         # flag patterns slower than 5x the median pattern
+COSTLY_MIN_MS_PER_MB = 50.0 # ...but never below this absolute cost
+BACKTRACK_GROWTH_LIMIT = 1.6  # time exponent vs. input length; ~1.0 is linear
+PROBE_STEP_BUDGET_S = 0.25  # stop growing adversarial inputs past this per step
+PROFILE_TIMEOUT_S = 20.0    # hard limit per pattern; exceeding it is catastrophic
+
+
+def keyword_list(data):
+    """
+    Normalize a loaded keyword file to a flat list of keywords.
+    Accepts a plain list, {"semantic_keywords": [[token, count], ...]}
+    or a {keyword: ...} mapping.
+    """
+    if isinstance(data, dict) and "semantic_keywords" in data:
+        data = data["semantic_keywords"]
+    if isinstance(data, dict):
+        return list(data.keys())
+    return [k[0] if isinstance(k, (list, tuple)) else k for k in data]
+
+
+def build_naive_regex(keywords):
+    return r"\b(" + "|".join(map(re.escape, keywords)) + r")\b"
+
+
+def _trie_branches(node):
+    leaves, branches = [], []
+    for ch in sorted(k for k in node if k):
+        child = node[ch]
+        if list(child) == [""]:
+            leaves.append(re.escape(ch))
+        else:
+            branches.append(re.escape(ch) + _trie_to_regex(child))
+    if len(leaves) == 1:
+        branches.append(leaves[0])
+    elif leaves:
+        branches.append("[" + "".join(leaves) + "]")
+    # single_atom: the only branch is one char or char class, so "?" needs no group
+    return branches, bool(leaves) and len(branches) == 1
+
+
+def _trie_to_regex(node):
+    branches, single_atom = _trie_branches(node)
+    terminal = "" in node
+    if not branches:
+        return ""
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    if single_atom:
+        return branches[0] + "?"
+    return "(?:" + "|".join(branches) + ")" + ("?" if terminal else "")
+
+
+def build_trie_regex(keywords):
+    r"""
+    Factor a keyword alternation into a prefix trie, e.g.
+    plan|planner|plugin -> \b(pl(?:an(?:ner)?|ugin))\b.
+    Siblings never share a first character, so the engine commits to at
+    most one branch per position instead of retrying every alternative.
+
+    The trie prefers the longest keyword while the naive alternation
+    prefers the first listed one; under \b...\b they only agree when every
+    keyword is \w+ (see trie_safe).
+    """
+    trie = {}
+    for kw in keywords:
+        if not kw:
+            continue
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    branches, _ = _trie_branches(trie)
+    return r"\b(" + "|".join(branches) + r")\b"
+
+
+def trie_safe(keywords):
+    """True if the trie form is guaranteed to match like the naive alternation."""
+    return all(re.fullmatch(r"\w+", k) for k in keywords if k)
+
+
+def validate_equivalent(naive, optimized, keywords, corpus_lines=()):
+    """
+    Check that the optimized pattern accepts exactly the same strings as
+    the naive alternation: every keyword, near-miss probes around each
+    keyword, and findall() over the benchmark corpus.
     """
+    naive_re, opt_re = re.compile(naive), re.compile(optimized)
+    probes = set()
+    for kw in keywords:
+        probes.update((kw, kw[:-1], kw + "x", kw + "_", "x" + kw, kw + " " + kw))
+    for probe in probes:
+        if bool(naive_re.fullmatch(probe)) != bool(opt_re.fullmatch(probe)):
+            return False
+    lines = list(corpus_lines) + [" ".join(keywords), "-".join(keywords), ".".join(keywords)]
+    return all(naive_re.findall(line) == opt_re.findall(line) for line in lines)
+
+
+def load_benchmark_corpus(paths=None):
+    """Read benchmark lines from the given files, or from this repo's sources."""
+    if paths is None:
+        paths = [
+            os.path.join(root, name)
+            for root, dirs, files in os.walk(BASE_DIR)
+            for name in files
+            if name.endswith(BENCHMARK_SUFFIXES)
+            and not any(part.startswith(".") for part in os.path.relpath(root, BASE_DIR).split(os.sep) if part != ".")
+        ]
+    lines = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                lines.extend(f.read().splitlines())
+        except OSError:
+            continue
+    return lines
+
+
+_REPEAT_OPS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+
+
+# ASCII approximations of the positive categories; negated ones stay "anything"
+_CATEGORY_CHARS = {
+    sre_parse.CATEGORY_DIGIT: set(range(ord("0"), ord("9") + 1)),
+    sre_parse.CATEGORY_SPACE: {ord(c) for c in " \t\n\r\f\v"},
+    sre_parse.CATEGORY_WORD: {
+        ord(c) for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+    },
+}
+
+
+def _union(a, b):
+    return None if a is None or b is None else a | b
+
+
+def _overlaps(a, b):
+    if a is None:
+        return b is None or bool(b)
+    if b is None:
+        return bool(a)
+    return bool(a & b)
+
+
+def _first_chars(items):
+    """
+    Return (chars, nullable) for a parsed sequence: the set of characters it
+    can start with (None meaning "could be anything") and whether it can
+    match the empty string.
+    """
+    chars = set()
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            first, nullable = {av}, False
+        elif op == sre_parse.IN:
+            first, nullable = set(), False
+            for in_op, in_av in av:
+                if in_op == sre_parse.LITERAL:
+                    first.add(in_av)
+                elif in_op == sre_parse.RANGE and in_av[1] - in_av[0] <= 256:
+                    first.update(range(in_av[0], in_av[1] + 1))
+                elif in_op == sre_parse.CATEGORY and in_av in _CATEGORY_CHARS:
+                    first.update(_CATEGORY_CHARS[in_av])
+                else:
+                    first = None
+                    break
+        elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            first, nullable = set(), True
+        elif op == sre_parse.SUBPATTERN:
+            first, nullable = _first_chars(av[-1])
+        elif op == getattr(sre_parse, "ATOMIC_GROUP", None):
+            first, nullable = _first_chars(av)
+        elif op == sre_parse.BRANCH:
+            parts = [_first_chars(alt) for alt in av[1]]
+            first = None if any(f is None for f, _ in parts) else set().union(*(f for f, _ in parts))
+            nullable = any(n for _, n in parts)
+        elif op in _REPEAT_OPS:
+            first, nullable = _first_chars(av[2])
+            nullable = nullable or av[0] == 0
+        elif op == sre_parse.GROUPREF:
+            first, nullable = None, True
+        else:  # ANY, NOT_LITERAL, CATEGORY, ...
+            first, nullable = None, False
+        chars = _union(chars, first)
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def _ambiguous_branch(alternatives, follow):
+    """
+    True if two alternatives can start on the same character. An empty-able
+    alternative starts with whatever may follow the branch (`follow`).
+    """
+    parts = [_first_chars(alt) for alt in alternatives]
+    if sum(nullable for _, nullable in parts) > 1:
+        return True
+    starts = [_union(first, follow) if nullable else first for first, nullable in parts]
+    for i, a in enumerate(starts):
+        for b in starts[i + 1:]:
+            if _overlaps(a, b):
+                return True
+    return False
+
+
+def _is_catastrophic(parsed, follow=None, inside_repeat=False):
+    r"""
+    Statically detect the usual exponential-backtracking shapes under an
+    unbounded repeat: a nested unbounded repeat that can also match the text
+    after it, e.g. (a+)+ or (\w+\s?)+, or alternatives that can match the
+    same text, e.g. (a|aa)*. A required, non-overlapping delimiter such as
+    (?:[a-z]+,)* or (?:foo\s+)+ keeps the loop unambiguous.
+
+    `follow` is the set of characters that can come after `parsed` inside
+    the enclosing repeat (None for "anything"); it only matters when
+    `inside_repeat` is set.
+    """
+    for i, (op, av) in enumerate(parsed):
+        after, rest_nullable = _first_chars(parsed[i + 1:])
+        if rest_nullable:
+            after = _union(after, follow)
+        if op in _REPEAT_OPS:
+            _min, _max, sub = av
+            unbounded = _max == sre_parse.MAXREPEAT
+            sub_first, _ = _first_chars(sub)
+            if unbounded and inside_repeat and _overlaps(sub_first, after):
+                return True
+            # Inside a loop the body can be followed by another pass of itself
+            sub_follow = _union(sub_first, after) if inside_repeat else sub_first
+            if not unbounded:
+                sub_follow = after
+            if _is_catastrophic(sub, sub_follow, inside_repeat or unbounded):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _is_catastrophic(av[-1], after, inside_repeat):
+                return True
+        elif op == getattr(sre_parse, "ATOMIC_GROUP", None):
+            if _is_catastrophic(av, after, inside_repeat):
+                return True
+        elif op == sre_parse.BRANCH:
+            if inside_repeat and _ambiguous_branch(av[1], after):
+                return True
+            if any(_is_catastrophic(b, after, inside_repeat) for b in av[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _is_catastrophic(av[1], after, inside_repeat):
+                return True
+    return False
+
+
+def _time_findall(compiled, lines, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            compiled.findall(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _backtracking_growth(compiled, pattern):
+    """
+    Time the pattern on adversarial inputs built from its own literal
+    characters, growing 4x per step, and return the worst observed time
+    exponent: ~1 for linear scans, ~2 for quadratic backtracking. Stops
+    as soon as one step exceeds PROBE_STEP_BUDGET_S.
+    """
+    seeds = {c for c in pattern if c.isalnum() or c == "_"} or {"a"}
+    worst = 0.0
+    for seed in sorted(seeds)[:8]:
+        prev = None
+        for n in (64, 256, 1024, 4096):
+            elapsed = _time_findall(compiled, [seed * n + "!"])
+            if elapsed > PROBE_STEP_BUDGET_S:
+                return float("inf")
+            if prev is not None and prev > 1e-4:
+                worst = max(worst, math.log(elapsed / prev, 4))
+            prev = elapsed
+    return worst
+
+
+def _profile_worker():
+    """Subprocess entry point for profile_regexes; reads one job from stdin."""
+    job = json.load(sys.stdin)
+    compiled = re.compile(job["pattern"])
+    seconds = _time_findall(compiled, job["lines"])
+    growth = _backtracking_growth(compiled, job["pattern"])
+    json.dump({"seconds": seconds, "growth": growth}, sys.stdout)
+
+
+def _profile_in_subprocess(pattern, corpus_lines):
+    """
+    Run the timing probes in a child process so a pathological pattern can
+    be killed. Returns None if the probes exceed PROFILE_TIMEOUT_S.
+    """
+    cmd = [
+        sys.executable, "-c",
+        "import sys; sys.path.insert(0, sys.argv[1]); "
+        "import patterns_dynamic; patterns_dynamic._profile_worker()",
+        BASE_DIR,
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            input=json.dumps({"pattern": pattern, "lines": corpus_lines}),
+            capture_output=True,
+            text=True,
+            timeout=PROFILE_TIMEOUT_S,
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode != 0:
+        raise RuntimeError(f"Profiling {pattern!r} failed:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def profile_regexes(regex_map, corpus_lines):
+    """
+    Time each regex over the benchmark corpus and flag risky rules.
+    Returns {name: {"ms_per_mb": float, "flags": [...]}}; flags are
+    "catastrophic_backtracking", "superlinear_backtracking" or "costly".
+    """
+    corpus_mb = max(sum(len(line) + 1 for line in corpus_lines), 1) / 1e6
+    report = {}
+    for name, pattern in regex_map.items():
+        if _is_catastrophic(sre_parse.parse(pattern)):
+            # Never time these: exponential inputs may not terminate
+            report[name] = {"ms_per_mb": None, "flags": ["catastrophic_backtracking"]}
+            continue
+        probe = _profile_in_subprocess(pattern, list(corpus_lines))
+        if probe is None:
+            report[name] = {"ms_per_mb": None, "flags": ["catastrophic_backtracking"]}
+            continue
+        flags = []
+        if probe["growth"] > BACKTRACK_GROWTH_LIMIT:
+            flags.append("superlinear_backtracking")
+        report[name] = {"ms_per_mb": round(probe["seconds"] * 1000 / corpus_mb, 2), "flags": flags}
+
+    timings = sorted(r["ms_per_mb"] for r in report.values() if r["ms_per_mb"] is not None)
+    if timings:
+        median = timings[len(timings) // 2]
+        limit = max(COSTLY_FACTOR * median, COSTLY_MIN_MS_PER_MB)
+        for r in report.values():
+            if r["ms_per_mb"] is not None and r["ms_per_mb"] > limit:
+                r["flags"].append("costly")
+    return report
+
+
+def export_dynamic_regexes(output_path="agentic_regex_patterns.json", optimize=True,
+                           profile=True, corpus_paths=None):
+    r"""
     Build reusable regex patterns for external systems, based on learned data.
     Saves a JSON file mapping categories to regex strings.
+
+    With `optimize`, keyword alternations made only of \w+ keywords are
+    trie-factored and each one is checked against the naive form (falling
+    back to it on any mismatch); other sets keep the naive form.
+    With `profile`, every pattern is timed on a benchmark corpus; costly
+    rules are reported and catastrophically backtracking ones abort the export.
     """
     regex_map = {}
+    keyword_sets = {}
+    corpus_lines = load_benchmark_corpus(corpus_paths) if (optimize or profile) else []
 
     # Core agentic detection
-    agentic_keywords = (
-        list(AGENTIC_KEYWORDS.keys()) if isinstance(AGENTIC_KEYWORDS, dict) else AGENTIC_KEYWORDS
-    )
-    regex_map["core_agentic"] = r"\b(" + "|".join(map(re.escape, agentic_keywords)) + r")\b"
+    keyword_sets["core_agentic"] = keyword_list(AGENTIC_KEYWORDS)
 
     # Framework patterns
     for fw, keywords in FRAMEWORK_KEYWORDS.items():
-        regex_map[f"framework_{fw.lower()}"] = r"\b(" + "|".join(map(re.escape, keywords)) + r")\b"
+        keyword_sets[f"framework_{fw.lower()}"] = keyword_list(keywords)
+
+    for name, keywords in keyword_sets.items():
+        naive = build_naive_regex(keywords)
+        regex_map[name] = naive
+        if optimize and trie_safe(keywords):
+            optimized = build_trie_regex(keywords)
+            if validate_equivalent(naive, optimized, keywords, corpus_lines):
+                regex_map[name] = optimized
+            else:
+                print(f"⚠️ Trie form of {name} differs from naive alternation, keeping naive")
 
     # Integration & metadata
     regex_map["integration_points"] = CATEGORY_PATTERNS["integration_points"].pattern
@@ -201,6 +573,15 @@ def export_dynamic_regexes(output_path="agentic_regex_patterns.json"):
     regex_map["config_metadata"] = CATEGORY_PATTERNS["config_metadata"].pattern
     regex_map["languages"] = CATEGORY_PATTERNS["languages"].pattern
 
+    if profile:
+        report = profile_regexes(regex_map, corpus_lines)
+        for name, result in report.items():
+            if result["flags"]:
+                print(f"⚠️ {name}: {', '.join(result['flags'])} ({result['ms_per_mb']} ms/MB)")
+        catastrophic = [n for n, r in report.items() if "catastrophic_backtracking" in r["flags"]]
+        if catastrophic:
+            raise ValueError(f"Refusing to export catastrophically backtracking regexes: {catastrophic}")
+
     # Save to file
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(regex_map, f, indent=2)
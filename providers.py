@@ -139,3 +139,9 @@ PROVIDERS = {
     # --- Devtool collections ---
     "LLM_Agents_DevTools": "https://github.com/M1n9X/llm_agents_devtools",
 }
+
+# Local, read-only directory trees (not git checkouts). These are scanned in
+# place and indexed under .agentic_index/ so reruns only re-read changed files.
+LOCAL_PROVIDERS = {
+    # "Internal_Agents_Mount": "/mnt/code/agents",
+}